@@ -3,9 +3,9 @@ import itertools
 import threading
 from typing import Optional, Iterator, List, Tuple
 
-_lock = threading.Lock()
+_lock = threading.Lock()  # guards lazy init only, not the fetch path
 _keys: List[Tuple[str, str]] = []
-_cycle: Optional[Iterator[int]] = None
+_counter: Optional[Iterator[int]] = None
 
 
 def load_keys() -> None:
@@ -13,9 +13,9 @@ def load_keys() -> None:
 
     GEMINI_API_KEYS: comma-separated list of keys.
     Fallback: single key in GEMINI_API_KEY.
-    Creates a round-robin iterator of index positions.
+    Resets the round-robin counter.
     """
-    global _keys, _cycle
+    global _keys, _counter
     raw = os.getenv("GEMINI_API_KEYS", "").strip()
     if raw:
         parts = [p.strip() for p in raw.split(",") if p.strip()]
@@ -27,21 +27,22 @@ def load_keys() -> None:
         raise RuntimeError(
             "No Gemini API keys configured (set GEMINI_API_KEYS or GEMINI_API_KEY)."
         )
-    _cycle = itertools.cycle(range(len(_keys)))
+    _counter = itertools.count()
 
 
 def get_next_key() -> Tuple[str, str]:
     """Return (label, api_key) using round-robin selection.
 
-    Lazily initializes keys on first call. Thread-safe.
+    Lazily initializes keys on first call. Thread-safe without a lock on the
+    hot path: next() on itertools.count is atomic under the GIL.
     """
-    global _cycle
-    with _lock:
-        if _cycle is None:
-            load_keys()
-        # _cycle now guaranteed
-        idx = next(_cycle)  # type: ignore[arg-type]
-        return _keys[idx]
+    if _counter is None:
+        with _lock:
+            if _counter is None:
+                load_keys()
+    keys = _keys  # snapshot so a concurrent reload can't shrink it under us
+    idx = next(_counter) % len(keys)  # type: ignore[arg-type]
+    return keys[idx]
 
 
 # Optional eager load (can be commented out if you prefer full laziness)
@@ -1,130 +1,457 @@
 import os
+import atexit
 import yaml
+import shutil
 import subprocess
 import time
 import json
 import hashlib
-from datetime import datetime
-from threading import Lock
+import xxhash
+import functools
+import re
+import string
+import random
+from collections import OrderedDict, deque
+from threading import Event, Lock, Thread
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
 from google import genai
-from typing import Optional
+from typing import Optional, Dict, FrozenSet
+from dataclasses import dataclass
 
 ANALYZER_TOOL_VERSION = "analyzer-0.1.0"
 
+# libyaml-backed loader when PyYAML was built with it; pure-Python otherwise.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# orjson when installed (C encoder, emits UTF-8 bytes directly); stdlib json
+# otherwise. Both produce and accept the same JSON.
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def _json_line(obj) -> bytes:
+    """Compact single-line JSON as UTF-8 bytes, newline-terminated."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+def _json_pretty(obj) -> str:
+    """Two-space indented JSON, as written to the report file."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 load_dotenv()
 
+
+@dataclass(frozen=True)
+class Config:
+    """Environment-derived settings, read once at import."""
+
+    api_key: Optional[str]
+    model: str
+    max_per_minute: int
+    cache_path: str
+    md_path: str
+    json_path: str
+    cache_max_entries: int
+    max_file_bytes: int
+
+
 # --- AI Configuration ---
 # The script reads the API key from your environment variables for security.
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
+CFG = Config(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    model=os.getenv("GEMINI_MODEL", "gemini-2.5-pro"),
+    max_per_minute=int(os.getenv("AI_MAX_CALLS_PER_MINUTE", "6")),
+    cache_path=os.getenv("AI_CACHE_FILE", ".ai_cache.jsonl"),
+    md_path=os.getenv("REPORT_MD_PATH", "analysis_report.md"),
+    json_path=os.getenv("REPORT_JSON_PATH", "analysis_report.json"),
+    cache_max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "10000")),
+    max_file_bytes=int(os.getenv("AI_MAX_FILE_BYTES", str(2 * 1024 * 1024))),
+)
 _active_client = None  # replace old 'client'
 _active_model = None
+# Default for client= parameters: "use _active_client". An explicit None means
+# the caller's own client could not be built and must not fall back to the
+# process-wide one (which may bill a different key).
+_ACTIVE_CLIENT = object()
+
+
+# One client per API key for the life of the process: each genai.Client owns
+# an httpx connection pool, so reusing it keeps TLS connections alive across
+# checks and runs instead of handshaking again for every run.
+_clients: Dict[str, "genai.Client"] = {}
+_clients_lock = Lock()
+
+
+def _make_client(api_key: str):
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is not None:
+            return client
+        try:
+            client = _clients[api_key] = genai.Client(api_key=api_key)
+        except Exception as e:
+            print(f"⚠️ Gemini client init failed for provided key: {e}")
+            return None
+        return client
 
 
 def set_ai_client(api_key: str, model: str):
     global _active_client, _active_model
     _active_model = model
-    try:
-        _active_client = genai.Client(api_key=api_key)
-    except Exception as e:
-        _active_client = None
-        print(f"⚠️ Gemini client init failed for provided key: {e}")
+    _active_client = _make_client(api_key)
 
 
 # --- Rate Limiter & Caching Layer -------------------------------------------------
 class RateLimiter:
-    """Simple token bucket / sliding window hybrid to cap calls per minute.
+    """Sliding-window limiter capping calls to max_per_minute in any 60s span.
 
     Environment variable AI_MAX_CALLS_PER_MINUTE (default 6) controls throughput.
+    A token bucket would be cheaper still, but a full bucket plus a minute of
+    refill admits ~2x the quota inside one window, which the provider's
+    per-minute limit rejects; the window check is O(expired) with a deque.
     """
 
     def __init__(self, max_per_minute: int):
         self.max_per_minute = max_per_minute
-        self.calls = []  # timestamps
+        # Monotonic timestamps, oldest first; never holds more than the quota.
+        self.calls = deque(maxlen=max_per_minute)
         self.lock = Lock()
 
     def acquire(self):
-        with self.lock:
-            now = time.time()
-            one_minute_ago = now - 60
-            # drop old timestamps
-            self.calls = [t for t in self.calls if t > one_minute_ago]
-            if len(self.calls) >= self.max_per_minute:
-                sleep_for = 60 - (now - self.calls[0]) + 0.1
-                if sleep_for > 0:
-                    print(
-                        f"  - ⏳ RateLimiter sleeping {sleep_for:.1f}s to respect quota..."
-                    )
-                    time.sleep(sleep_for)
-            # record call
-            self.calls.append(time.time())
+        calls = self.calls
+        while True:
+            with self.lock:
+                # Monotonic so wall-clock jumps (NTP, DST) can't stall or
+                # burst the window.
+                now = time.monotonic()
+                one_minute_ago = now - 60
+                while calls and calls[0] <= one_minute_ago:
+                    calls.popleft()
+                if len(calls) < self.max_per_minute:
+                    # record call
+                    calls.append(now)
+                    return
+                sleep_for = 60 - (now - calls[0]) + 0.1
+            # Sleep without holding the lock so other workers aren't stalled
+            # behind it, then re-check: someone else may have taken the slot.
+            print(f"  - ⏳ RateLimiter sleeping {sleep_for:.1f}s to respect quota...")
+            time.sleep(sleep_for)
 
 
-AI_MAX_CALLS_PER_MINUTE = int(os.getenv("AI_MAX_CALLS_PER_MINUTE", "6"))
-_rate_limiter = RateLimiter(AI_MAX_CALLS_PER_MINUTE)
+_rate_limiter = RateLimiter(CFG.max_per_minute)
+
+# Backoff cap before retry N (2s base doubling). The actual sleep is drawn
+# uniformly from [0, cap] ("full jitter") so concurrent workers that hit the
+# same 429 don't retry in lockstep.
+_RETRY_DELAYS = (2.0, 4.0, 8.0, 16.0)
+# Transient failures worth retrying (quota, overload, timeouts).
+_RETRYABLE_RE = re.compile(r"429|rate|unavail|overload|timeout|503", re.IGNORECASE)
+_jitter = random.SystemRandom()
 
 _cache_lock = Lock()
-_cache_path = os.getenv("AI_CACHE_FILE", ".ai_cache.json")
-try:
-    if os.path.exists(_cache_path):
-        with open(_cache_path, "r") as _f:
-            _ai_cache = json.load(_f)
-    else:
-        _ai_cache = {}
-except Exception:
-    _ai_cache = {}
+_cache_path = CFG.cache_path
+_ai_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_log_lines = 0  # lines currently in the append-only cache log
+# True when the log on disk does not hold every in-memory entry (e.g. after
+# migrating a legacy .ai_cache.json snapshot) and needs a full rewrite.
+_cache_dirty = False
+_cache_loaded = False  # the log is replayed on first use, not at import
+# Entries still under the pre-XXH3 SHA-256 key; re-keyed on first hit.
+_legacy_keys = 0
+# Write-behind buffer of encoded log lines (guarded by _cache_lock), flushed
+# by a daemon thread every _FLUSH_INTERVAL seconds or once _FLUSH_BATCH lines
+# are waiting, and synchronously by _save_cache at run end / exit.
+_pending_lines: list = []
+_FLUSH_INTERVAL = 5.0
+_FLUSH_BATCH = 16
+_flush_wanted = Event()
+_cache_writer: Optional[Thread] = None
+_COMPACT_INTERVAL = 2.0  # min seconds between full log rewrites
+_last_compact = float("-inf")
+
+
+def _load_cache():
+    """Replay the JSONL cache log ({"k": key, "v": answer} per line).
+
+    A line holding a plain mapping is a legacy whole-cache JSON snapshot and is
+    merged as-is, so old .ai_cache.json files keep working.
+    """
+    global _cache_log_lines, _cache_dirty, _legacy_keys
+    path = _cache_path
+    if not os.path.exists(path):
+        legacy = os.path.splitext(path)[0] + ".json"
+        if legacy == path or not os.path.exists(legacy):
+            return
+        path = legacy
+        _cache_dirty = True
+    lines = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                obj = _json_loads(line)
+            except ValueError:
+                continue  # torn write from an interrupted append
+            lines += 1
+            if isinstance(obj, dict) and obj.keys() == {"k", "v"}:
+                _ai_cache[obj["k"]] = obj["v"]
+                _ai_cache.move_to_end(obj["k"])  # later lines are more recent
+            elif isinstance(obj, dict):
+                _ai_cache.update(obj)
+                _cache_dirty = True
+    if path == _cache_path:
+        _cache_log_lines = lines
+    _evict_lru()
+    _legacy_keys = sum(1 for k in _ai_cache if len(k) == 64)
+
+
+def _evict_lru():
+    """Drop least recently used entries beyond AI_CACHE_MAX_ENTRIES.
+
+    Hits move their key to the end of the OrderedDict, so the first key is
+    always the least recently used. Caller holds _cache_lock (or is the
+    import-time loader). Evicted legacy SHA-256 entries leave _legacy_keys, so
+    the fallback lookup stops once none remain.
+    """
+    global _legacy_keys
+    while len(_ai_cache) > CFG.cache_max_entries:
+        evicted, _ = _ai_cache.popitem(last=False)
+        if len(evicted) == 64 and _legacy_keys:
+            _legacy_keys -= 1
 
 
 def _hash_prompt(prompt: str) -> str:
-    return hashlib.sha256(prompt.encode("utf-8", errors="ignore")).hexdigest()
+    # Non-adversarial cache key: XXH3-64 runs at memory bandwidth, far below
+    # any cryptographic hash. Kept as 16-char hex because the cache is JSON;
+    # the length never collides with older 64-char SHA-256 keys, which
+    # _migrate_legacy_entry re-keys on their first hit.
+    return format(
+        xxhash.xxh3_64_intdigest(prompt.encode("utf-8", errors="ignore")), "016x"
+    )
+
+
+def _migrate_legacy_entry(prompt: str, key: str) -> bool:
+    """Move an answer cached under the old SHA-256 key to ``key``.
+
+    Caller holds _cache_lock. The new entry is appended to the log; the
+    legacy line is dropped at the next compaction.
+    """
+    global _legacy_keys
+    legacy = hashlib.sha256(prompt.encode("utf-8", errors="ignore")).hexdigest()
+    answer = _ai_cache.pop(legacy, None)
+    if answer is None:
+        return False
+    _legacy_keys -= 1
+    _ai_cache[key] = answer
+    _queue_cache_entry(key, answer)
+    return True
+
+
+def _queue_cache_entry(key: str, answer: str):
+    """Buffer one entry for the background log writer; caller holds _cache_lock.
+
+    Answers become visible in _ai_cache immediately; only the disk append is
+    deferred (write-behind), so a burst of answers costs one write.
+    """
+    global _cache_writer
+    _pending_lines.append(_json_line({"k": key, "v": answer}))
+    if _cache_writer is None:
+        _cache_writer = Thread(
+            target=_cache_writer_loop, name="ai-cache-writer", daemon=True
+        )
+        _cache_writer.start()
+    if len(_pending_lines) >= _FLUSH_BATCH:
+        _flush_wanted.set()
+
+
+def _flush_pending():
+    """Append buffered entries to the log; caller holds _cache_lock.
+
+    One os.write on an O_APPEND descriptor for the whole batch, so writers in
+    other processes never interleave inside a line (a torn tail from a crash
+    is skipped on load).
+    """
+    global _cache_log_lines, _cache_dirty
+    if not _pending_lines:
+        return
+    data = b"".join(_pending_lines)
+    count = len(_pending_lines)
+    _pending_lines.clear()
+    try:
+        fd = os.open(_cache_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+    except OSError:
+        _cache_dirty = True  # entries are still in memory; rewrite them later
+        return
+    _cache_log_lines += count
+    # Once the LRU cap is reached every insert also evicts, so compact as we
+    # go instead of only at run end.
+    if _compaction_due():
+        _compact_cache()
+
+
+def _cache_writer_loop():
+    while True:
+        _flush_wanted.wait(_FLUSH_INTERVAL)
+        _flush_wanted.clear()
+        try:
+            with _cache_lock:
+                _flush_pending()
+        except Exception:
+            pass  # non-critical; _save_cache retries at run end / exit
+
+
+def _compact_cache():
+    """Rewrite the log from the in-memory cache; caller holds _cache_lock.
+
+    Written to a sibling temp file and swapped in with os.replace, so a crash
+    mid-rewrite leaves the previous log intact rather than a truncated one.
+    """
+    global _cache_dirty, _cache_log_lines, _last_compact
+    tmp_path = f"{_cache_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(_json_line({"k": k, "v": v}) for k, v in _ai_cache.items())
+    os.replace(tmp_path, _cache_path)
+    _pending_lines.clear()  # already included in the rewrite
+    _cache_log_lines = len(_ai_cache)
+    _cache_dirty = False
+    _last_compact = time.monotonic()
+
+
+def _log_is_bloated() -> bool:
+    """More than twice as many log lines as live entries (overwrites/evictions)."""
+    return _cache_log_lines > 2 * len(_ai_cache)
+
 
+def _compaction_due() -> bool:
+    """Log has drifted and the last rewrite is at least _COMPACT_INTERVAL old.
 
-def _save_cache():
+    Concurrent runs finishing together would otherwise each rewrite the whole
+    file back to back; the debounce lets one rewrite cover them.
+    """
+    if not (_cache_dirty or _log_is_bloated()):
+        return False
+    return time.monotonic() - _last_compact >= _COMPACT_INTERVAL
+
+
+def _save_cache(force: bool = False):
+    """Flush buffered entries and compact the log if it has drifted.
+
+    New entries are appended in batches by the writer thread; this also
+    rewrites the file when it is missing entries or has grown past twice the
+    live entry count (at most every _COMPACT_INTERVAL seconds unless force).
+    """
     try:
         with _cache_lock:
-            with open(_cache_path, "w") as f:
-                json.dump(_ai_cache, f)
+            if not _cache_loaded:
+                return  # nothing read or written this process
+            _flush_pending()
+            if force and (_cache_dirty or _log_is_bloated()):
+                _compact_cache()
+            elif _compaction_due():
+                _compact_cache()
     except Exception:
         pass  # non-critical
 
 
-def generate_ai_content(prompt: str):
+def _ensure_cache_loaded():
+    """Replay the cache log once, on first use; caller holds _cache_lock.
+
+    Importing the module (API startup, non-AI rubrics) no longer pays for
+    reading the whole log.
+    """
+    global _cache_loaded
+    if _cache_loaded:
+        return
+    _cache_loaded = True
+    try:
+        _load_cache()
+    except Exception:
+        _ai_cache.clear()
+
+
+# Compaction runs at the end of each run_analyzer call and again at exit.
+atexit.register(_save_cache, force=True)
+
+# Prompt key -> Future of the request currently fetching it (guarded by
+# _cache_lock); lets concurrent identical prompts coalesce.
+_inflight: Dict[str, Future] = {}
+
+
+def generate_ai_content(
+    prompt: str, client=_ACTIVE_CLIENT, model: Optional[str] = None
+):
     """Central AI call with caching, rate limiting, and robust retries.
 
+    client/model default to the process-wide active client (set_ai_client);
+    run_analyzer passes its own so concurrent runs can use different keys.
+    client=None fails the call ("AI client not configured").
+
+    Concurrent callers with an identical prompt share one in-flight request
+    (single-flight) instead of each missing the cache and calling the API.
+
     Returns tuple (success: bool, answer: str)
     """
     key = _hash_prompt(prompt)
     with _cache_lock:
-        if key in _ai_cache:
+        _ensure_cache_loaded()
+        if key in _ai_cache or (_legacy_keys and _migrate_legacy_entry(prompt, key)):
+            _ai_cache.move_to_end(key)  # mark most recent
             return True, _ai_cache[key]
+        pending = _inflight.get(key)
+        leader = pending is None
+        if leader:
+            pending = _inflight[key] = Future()
+    if not leader:
+        return pending.result()
 
-    max_attempts = 5
-    base_delay = 2
+    try:
+        result = _request_ai_content(prompt, key, client, model)
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    else:
+        pending.set_result(result)
+    finally:
+        with _cache_lock:
+            _inflight.pop(key, None)
+    return result
+
+
+def _request_ai_content(prompt: str, key: str, client=_ACTIVE_CLIENT, model=None):
+    """Call the model with retries and cache a successful answer under key."""
+    if client is _ACTIVE_CLIENT:
+        client = _active_client
+    model = model or _active_model or CFG.model
+    max_attempts = len(_RETRY_DELAYS) + 1
     for attempt in range(1, max_attempts + 1):
         _rate_limiter.acquire()
         try:
-            if _active_client is None:
+            if client is None:
                 raise RuntimeError("AI client not configured (no active API key)")
-            response = _active_client.models.generate_content(
-                model=_active_model or GEMINI_MODEL,
-                contents=prompt,
-            )
+            response = client.models.generate_content(model=model, contents=prompt)
             answer = (response.text or "").strip()
             with _cache_lock:
                 _ai_cache[key] = answer
-            _save_cache()
+                _evict_lru()
+                _queue_cache_entry(key, answer)
             return True, answer
         except Exception as e:  # Retry logic
-            error_message = str(e).lower()
-            retryable = any(
-                k in error_message
-                for k in ["429", "rate", "unavail", "overload", "timeout", "503"]
-            )
+            retryable = _RETRYABLE_RE.search(str(e)) is not None
             if retryable and attempt < max_attempts:
-                delay = base_delay * (2 ** (attempt - 1))
-                # jitter
-                delay += min(3, 0.25 * delay)
+                delay = _jitter.uniform(0, _RETRY_DELAYS[attempt - 1])
                 print(
                     f"  - ⚠️  AI call retry {attempt}/{max_attempts-1} after {delay:.1f}s ({e})"
                 )
@@ -139,80 +466,425 @@ def generate_ai_content(prompt: str):
 # -------------------------
 
 AI_SCORE_MAP = {"PASS": 1.0, "PARTIAL": 0.5, "FAIL": 0.0}
+_FIRST_WORD_RE = re.compile(r"\S+")
+
+# Absolute path so subprocess can take CPython's posix_spawn fast path (it is
+# only used when the executable has a directory component).
+GIT_EXECUTABLE = shutil.which("git") or "git"
+
+
+_TEMPLATE_FIELDS = frozenset({"context", "file_path"})
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_template(template: str):
+    """Return a `fn(context, file_path) -> prompt` for a rubric prompt template.
+
+    The template is parsed once with string.Formatter (which also resolves
+    escaped {{ }} braces); each call then only joins literals and values.
+    Anything the fast path doesn't model (other fields, format specs,
+    conversions, malformed braces) falls back to str.format so behaviour,
+    including its errors, is unchanged.
+    """
+
+    def fallback(context, file_path):
+        return template.format(context=context, file_path=file_path)
+
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError:
+        return fallback
+    pieces = []  # literal, field, literal, field, ..., literal
+    for literal, field, spec, conversion in parsed:
+        if field is not None and (field not in _TEMPLATE_FIELDS or spec or conversion):
+            return fallback
+        if pieces and len(pieces) % 2:
+            pieces[-1] += literal  # previous item was a literal too
+        else:
+            pieces.append(literal)
+        if field is not None:
+            pieces.append(field)
+    if len(pieces) % 2 == 0:
+        pieces.append("")
 
+    def render(context, file_path):
+        values = {"context": str(context), "file_path": str(file_path)}
+        out = pieces[:]
+        for i in range(1, len(out), 2):
+            out[i] = values[out[i]]
+        return "".join(out)
 
-def run_ai_check(check, repo_path):
+    return render
+
+
+class GitSession:
+    """Per-run git command runner bound to a single repository.
+
+    git has no long-lived batch mode for porcelain commands such as `log` or
+    `rev-list`, so rather than keeping a helper process alive the session
+    memoizes each command's output: identical invocations made by different
+    checks during one analyzer run fork git only once.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._outputs = {}
+        self._lock = Lock()
+
+    def run(self, *args: str) -> str:
+        """Return stdout of `git -C <repo> <args>`; raises CalledProcessError."""
+        with self._lock:
+            if args in self._outputs:
+                return self._outputs[args]
+        # posix_spawn fast path: keep close_fds=False and never add cwd=,
+        # preexec_fn=, shell=True or start_new_session= here (each one forces
+        # fork+exec); select the repo with `-C` instead.
+        process = subprocess.run(
+            [GIT_EXECUTABLE, "-C", self.repo_path, *args],
+            capture_output=True,
+            close_fds=False,
+        )
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode,
+                process.args,
+                process.stdout,
+                process.stderr.decode("utf-8", errors="replace"),
+            )
+        # Raw bytes from the pipe, decoded once; small outputs such as
+        # `rev-list --count` skip the text-mode wrapper entirely.
+        output = process.stdout.decode("utf-8", errors="replace")
+        with self._lock:
+            self._outputs[args] = output
+        return output
+
+    def stream(self, *args: str, max_chars: int) -> str:
+        """Like run(), but stop reading (and stop git) after ~max_chars.
+
+        Lines are consumed as git produces them; once the budget is spent the
+        process is terminated, so neither git nor Python does work for output
+        that would be thrown away. Returns the collected text, with a
+        truncation marker when the budget was hit.
+        """
+        key = (args, max_chars)
+        with self._lock:
+            if key in self._outputs:
+                return self._outputs[key]
+        lines = []
+        used = 0
+        truncated = False
+        # Same posix_spawn constraints as run().
+        with subprocess.Popen(
+            [GIT_EXECUTABLE, "-C", self.repo_path, *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            close_fds=False,
+        ) as process:
+            assert process.stdout is not None
+            for line in process.stdout:
+                if used + len(line) > max_chars:
+                    truncated = True
+                    process.terminate()
+                    break
+                lines.append(line)
+                used += len(line)
+            if not truncated:
+                stderr = process.stderr.read() if process.stderr else ""
+                if process.wait() != 0:
+                    raise subprocess.CalledProcessError(
+                        process.returncode, process.args, "".join(lines), stderr
+                    )
+        output = "".join(lines)
+        if truncated:
+            output += "... (git log truncated due to length)\n"
+        with self._lock:
+            self._outputs[key] = output
+        return output
+
+
+# Directories not walked for untracked files (VCS metadata, vendored deps,
+# build output). Files git tracks under them are still indexed.
+INDEX_SKIP_DIRS = {
+    ".git",
+    "node_modules",
+    ".venv",
+    "venv",
+    "__pycache__",
+    "dist",
+    "build",
+}
+
+
+@dataclass(frozen=True)
+class RepoIndex:
+    """Snapshot of a repository tree, taken once per analyzer run.
+
+    files:   basename -> path of its shallowest occurrence
+    depths:  basename -> directory depth of that occurrence (root files = 0)
+    paths:   every file/dir entry seen, relative to root (normpath form)
+    scanned: relative dirs whose entries were fully listed ("." = root)
+    """
+
+    root: str
+    files: Dict[str, str]
+    depths: Dict[str, int]
+    paths: FrozenSet[str]
+    scanned: FrozenSet[str]
+
+    def exists(self, rel_path: str) -> bool:
+        """os.path.exists(root/rel_path), answered from the index when possible."""
+        rel = os.path.normpath(rel_path)
+        if rel in self.paths:
+            return True
+        if (os.path.dirname(rel) or ".") in self.scanned:
+            return False  # parent listing is complete: definitely absent
+        # Pruned/symlinked subtree or outside the repo: ask the filesystem.
+        return os.path.exists(os.path.join(self.root, rel_path))
+
+    def find_shallow(self, names, max_depth: int) -> Optional[str]:
+        """Relative path of the shallowest file matching any basename in names.
+
+        Only files at most max_depth directories below the root count; ties
+        at the same depth go to the alphabetically first basename.
+        """
+        best = None
+        for name in {os.path.basename(n) for n in names}:
+            depth = self.depths.get(name)
+            if depth is None or depth > max_depth:
+                continue
+            if best is None or (depth, name) < best:
+                best = (depth, name)
+        if best is None:
+            return None
+        return os.path.relpath(self.files[best[1]], self.root)
+
+
+def build_repo_index(repo_path, git: Optional[GitSession] = None) -> RepoIndex:
+    """Index the repository, preferring git's own file list over a disk walk.
+
+    Inside a work tree `git ls-files` answers from the index file plus one
+    pass over untracked files. Gitignored files still count, as they did with
+    a plain disk walk (rubrics check for things like a local `.env` or
+    `db.sqlite3`): ignored files are listed too, and wholly ignored
+    directories are collapsed by `--directory` and then scanned from disk.
+    INDEX_SKIP_DIRS (virtualenvs, build output) only filter untracked and
+    ignored paths: tracked files under e.g. a committed `dist/` are indexed.
+    Anything else falls back to a scandir walk.
+    """
+    git = git or GitSession(repo_path)
+    try:
+        tracked = git.run("ls-files", "-z", "--cached").split("\0")
+        untracked = git.run("ls-files", "-z", "--others", "--exclude-standard").split(
+            "\0"
+        )
+        ignored = git.run(
+            "ls-files",
+            "-z",
+            "--others",
+            "--ignored",
+            "--exclude-standard",
+            "--directory",
+        ).split("\0")
+        deleted = set(git.run("ls-files", "-z", "--deleted").split("\0"))
+    except (subprocess.CalledProcessError, OSError):
+        return _scan_repo_index(repo_path)
+    files: Dict[str, str] = {}
+    depths: Dict[str, int] = {}
+    paths = set()
+    scanned = set()
+    ignored_dirs = []
+    n_tracked = len(tracked)
+    for pos, rel in enumerate(tracked + untracked + ignored):
+        if not rel or rel in deleted:
+            continue
+        if rel.endswith("/"):  # wholly ignored directory
+            ignored_dirs.append(rel.rstrip("/"))
+            continue
+        parts = rel.split("/")
+        # Tracked files always count (e.g. a committed dist/); the skip list
+        # only keeps untracked clutter such as virtualenvs out of the index.
+        if pos >= n_tracked and INDEX_SKIP_DIRS.intersection(parts[:-1]):
+            continue
+        depth = len(parts) - 1
+        name = parts[-1]
+        if name not in files or depth < depths[name]:
+            files[name] = os.path.join(repo_path, *parts)
+            depths[name] = depth
+        # Record the file and every directory above it.
+        for i in range(len(parts), 0, -1):
+            entry = os.sep.join(parts[:i])
+            if entry in paths:
+                break
+            paths.add(entry)
+    for rel in ignored_dirs:
+        parts = rel.split("/")
+        if INDEX_SKIP_DIRS.intersection(parts):
+            continue
+        rel_dir = os.sep.join(parts)
+        for i in range(len(parts), 0, -1):
+            paths.add(os.sep.join(parts[:i]))
+        _scan_tree(
+            os.path.join(repo_path, *parts),
+            rel_dir,
+            len(parts),
+            files,
+            depths,
+            paths,
+            scanned,
+        )
+    # Only the scanned ignored subtrees are known to be complete; other
+    # exists() misses fall through to the filesystem.
+    return RepoIndex(repo_path, files, depths, frozenset(paths), frozenset(scanned))
+
+
+def _scan_repo_index(repo_path) -> RepoIndex:
+    """Index the repository with one breadth-first `os.scandir` pass.
+
+    DirEntry carries the d_type, so no extra stat per entry. INDEX_SKIP_DIRS
+    and symlinked dirs are recorded as entries but not descended into. Depth
+    travels with each queued directory rather than being derived from paths.
+    """
+    files: Dict[str, str] = {}
+    depths: Dict[str, int] = {}
+    paths = set()
+    scanned = set()
+    _scan_tree(repo_path, ".", 0, files, depths, paths, scanned)
+    return RepoIndex(repo_path, files, depths, frozenset(paths), frozenset(scanned))
+
+
+def _scan_tree(top, top_rel, top_depth, files, depths, paths, scanned):
+    """Breadth-first scandir of ``top`` into the given index containers.
+
+    ``top_rel``/``top_depth`` place ``top`` within the repository, so a
+    subtree can be merged into an index built from git's file list.
+    """
+    pending = deque([(top, top_rel, top_depth)])
+    while pending:
+        current, rel_dir, depth = pending.popleft()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    rel = (
+                        entry.name
+                        if rel_dir == "."
+                        else f"{rel_dir}{os.sep}{entry.name}"
+                    )
+                    paths.add(rel)
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in INDEX_SKIP_DIRS:
+                            pending.append((entry.path, rel, depth + 1))
+                    elif entry.name not in files or depth < depths[entry.name]:
+                        files[entry.name] = entry.path
+                        depths[entry.name] = depth
+        except OSError:
+            continue  # unreadable directory
+        scanned.add(rel_dir)
+
+
+def find_file_in_repo(filename, repo_path):
+    """Finds the shallowest occurrence of a file in the repository."""
+    return build_repo_index(repo_path).files.get(filename)
+
+
+def run_ai_check(
+    check,
+    repo_path,
+    git: Optional[GitSession] = None,
+    repo_index: Optional[RepoIndex] = None,
+    client=_ACTIVE_CLIENT,
+    model: Optional[str] = None,
+):
     """Run an AI-based check and return (status, details_list, score).
 
     status: PASS | PARTIAL | FAIL
     score:  1.0  | 0.5     | 0.0  (only ai_check supports PARTIAL)
     """
-    prompt_template = check.get("prompt", "")
+    # Read the check's settings once up front.
+    get = check.get
+    render_prompt = _compile_template(get("prompt", ""))
+    context_source = get("context_source")
+    git_depth = get("git_log_depth", 25)
+    per_file_limit = get("per_file_char_limit", 8000)
+    total_cap = get("total_context_char_limit", 30000)
+    files = get("files_to_analyze")
     details = []
 
     # Git log context
-    if check.get("context_source") == "git_log":
+    if context_source == "git_log":
+        git = git or GitSession(repo_path)
         try:
-            process = subprocess.run(
-                [
-                    "git",
-                    "-C",
-                    repo_path,
-                    "log",
-                    "--oneline",
-                    "--graph",
-                    "-n",
-                    str(check.get("git_log_depth", 25)),
-                ],
-                capture_output=True,
-                text=True,
-                check=True,
-                encoding="utf-8",
+            output = git.stream(
+                "log",
+                "--oneline",
+                "--graph",
+                "-n",
+                str(git_depth),
+                max_chars=total_cap,
             )
-            context = process.stdout or "(no commits)"
+            context = output or "(no commits)"
         except Exception as e:
             return (
                 "FAIL",
                 [f"  - FAILED: Could not retrieve git history. Error: {e}"],
                 0.0,
             )
-        prompt = prompt_template.format(context=context, file_path=None)
+        prompt = render_prompt(context=context, file_path=None)
 
     # File context
-    elif "files_to_analyze" in check:
-        consolidated_context = ""
+    elif files is not None:
+        parts: list[str] = []
+        used = 0  # chars collected so far, checked against total_cap
         missing = []
-        for filename in check["files_to_analyze"]:
-            file_path = find_file_in_repo(filename, repo_path)
+        if repo_index is None:
+            repo_index = build_repo_index(repo_path)
+        for filename in files:
+            file_path = repo_index.files.get(filename)
             if not file_path:
                 missing.append(filename)
                 continue
             try:
-                with open(file_path, "r", errors="ignore") as f:
-                    content = f.read()
-                max_file_len = int(check.get("per_file_char_limit", 8000))
-                if len(content) > max_file_len:
-                    content = content[:max_file_len] + "\n... (truncated)"
-                consolidated_context += f"\n\n--- FILE: {file_path} ---\n{content}"
+                # One stat-sized binary read capped at the limit, decoded once:
+                # huge files (lock files etc.) never get loaded in full.
+                size = os.stat(file_path).st_size
+                if size > CFG.max_file_bytes:
+                    # Not even opened: a multi-MB file is almost always a
+                    # binary or generated artifact picked up by name.
+                    part = (
+                        f"\n\n--- FILE: {file_path} (skipped: {size} bytes exceeds"
+                        f" AI_MAX_FILE_BYTES) ---\n"
+                    )
+                else:
+                    # Never read past what total_cap can still hold (+1 so the
+                    # context-truncated marker still fires).
+                    budget = total_cap - used + 1
+                    with open(file_path, "rb") as f:
+                        raw = f.read(min(size, per_file_limit, budget))
+                    content = raw.decode("utf-8", errors="ignore")
+                    if size > per_file_limit:
+                        content += "\n... (truncated)"
+                    part = f"\n\n--- FILE: {file_path} ---\n{content}"
             except Exception as e:
-                consolidated_context += (
-                    f"\n\n--- FILE: {file_path} (read error: {e}) ---\n"
-                )
+                part = f"\n\n--- FILE: {file_path} (read error: {e}) ---\n"
+            parts.append(part)
+            used += len(part)
+            if used > total_cap:
+                break  # everything after this would be cut off below anyway
+        consolidated_context = "".join(parts)
         if not consolidated_context:
             return (
                 "FAIL",
                 ["  - FAILED: None of the target files for analysis were found."],
                 0.0,
             )
-        global_cap = int(check.get("total_context_char_limit", 30000))
-        if len(consolidated_context) > global_cap:
+        if len(consolidated_context) > total_cap:
             consolidated_context = (
-                consolidated_context[:global_cap]
+                consolidated_context[:total_cap]
                 + "\n... (context truncated due to length)"
             )
-        prompt = prompt_template.format(
-            context=consolidated_context, file_path="multiple files"
-        )
+        prompt = render_prompt(context=consolidated_context, file_path="multiple files")
         if missing:
             details.append(f"  - INFO: Missing files skipped: {', '.join(missing)}")
     else:
@@ -225,14 +897,17 @@ def run_ai_check(check, repo_path):
         )
 
     print("  - 🤖 Sending context to AI (with caching & rate limiting)...")
-    ok, answer = generate_ai_content(prompt)
+    ok, answer = generate_ai_content(prompt, client, model)
     prefix = "  - "
     if not ok:
         return "FAIL", details + [prefix + answer], 0.0
 
-    # Parse first token for PASS / PARTIAL / FAIL
-    first_line = answer.strip().splitlines()[0] if answer.strip() else ""
-    token = first_line.split(None, 1)[0].upper() if first_line else "FAIL"
+    # Parse first token for PASS / PARTIAL / FAIL (strip once, not twice)
+    # The verdict is the first whitespace-delimited word; line breaks count as
+    # whitespace, so this equals the first word of the first non-blank line
+    # without copying or splitting the rest of the response.
+    match = _FIRST_WORD_RE.search(answer)
+    token = match.group().upper() if match else "FAIL"
     if token not in AI_SCORE_MAP:
         # If rubric not yet updated to output PARTIAL, fall back:
         if token.startswith("PASS"):
@@ -245,51 +920,27 @@ def run_ai_check(check, repo_path):
     return token, details + [prefix + answer], score
 
 
-def find_file_in_repo(filename, repo_path):
-    """Recursively finds the first occurrence of a file in the repository."""
-    for root, _, files in os.walk(repo_path):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
-
-
-def run_file_exists_check(check, repo_path):
+def run_file_exists_check(check, repo_path, repo_index: Optional[RepoIndex] = None):
     """Checks if a single file or one of multiple possible files exists."""
+    if repo_index is None:
+        repo_index = build_repo_index(repo_path)
     recursive = bool(check.get("recursive"))  # optional flag enabling deep search
-    max_depth = int(check.get("max_depth", 2))  # default depth limit when recursive
+    max_depth = check.get("max_depth", 2)  # default depth limit when recursive
 
     def _recursive_search(target_names):
         """Return (found: bool, relative_path or None).
 
         Constraints:
         - Searches by basename only.
-        - Ignores any directory named '.venv'.
-        - Prunes traversal beyond `max_depth` levels below repo root.
+        - Ignores INDEX_SKIP_DIRS (e.g. '.venv', 'node_modules').
+        - Ignores matches more than `max_depth` levels below repo root.
         """
-        basenames = {os.path.basename(p) for p in target_names}
-        root_depth = repo_path.rstrip(os.sep).count(os.sep)
-        for root, dirs, files in os.walk(repo_path):
-            # Current depth (root depth = 0)
-            current_depth = root.rstrip(os.sep).count(os.sep) - root_depth
-            # Prune directories in-place: remove '.venv' and those that would exceed max_depth
-            if current_depth >= max_depth:
-                # No need to descend further from here
-                dirs[:] = []
-            else:
-                dirs[:] = [
-                    d for d in dirs if d != ".venv"  # ignore virtual env folders
-                ]
-            intersect = basenames.intersection(files)
-            if intersect:
-                chosen = sorted(intersect)[0]
-                rel_path = os.path.relpath(os.path.join(root, chosen), repo_path)
-                return True, rel_path
-        return False, None
+        rel_path = repo_index.find_shallow(target_names, max_depth)
+        return rel_path is not None, rel_path
 
     if "path" in check:
         raw = check["path"]
-        path_to_check = os.path.join(repo_path, raw)
-        if os.path.exists(path_to_check):
+        if repo_index.exists(raw):
             return True, [f"  - PASSED: '{raw}' found."]
         if recursive:
             found, rel = _recursive_search([raw])
@@ -306,7 +957,7 @@ def run_file_exists_check(check, repo_path):
     elif "paths" in check:
         # First pass: direct matches
         for path_option in check["paths"]:
-            if os.path.exists(os.path.join(repo_path, path_option)):
+            if repo_index.exists(path_option):
                 return True, [
                     f"  - PASSED: Found required dependency file ('{path_option}')."
                 ]
@@ -329,16 +980,15 @@ def run_file_exists_check(check, repo_path):
     return False, ["  - FAILED: Check is misconfigured (needs 'path' or 'paths')."]
 
 
-def run_git_commit_count_check(check, repo_path):
+def run_git_commit_count_check(check, repo_path, git: Optional[GitSession] = None):
     """Checks if the repository has a minimum number of commits."""
+    git = git or GitSession(repo_path)
     try:
-        command = ["git", "-C", repo_path, "rev-list", "--count", "HEAD"]
-        process = subprocess.run(
-            command, capture_output=True, text=True, check=True, encoding="utf-8"
-        )
-        commit_count = int(process.stdout.strip())
+        commit_count = int(git.run("rev-list", "--count", "HEAD").strip())
 
-        min_commits = check["min_commits"]
+        min_commits = check.get("min_commits")
+        if min_commits is None:
+            return False, ["  - FAILED: Check has no valid 'min_commits' setting."]
         if commit_count >= min_commits:
             return True, [
                 f"  - PASSED: Found {commit_count} commits (minimum was {min_commits})."
@@ -353,6 +1003,34 @@ def run_git_commit_count_check(check, repo_path):
         ]
 
 
+# Numeric rubric settings; YAML may hand these over as strings ("8000").
+_INT_CHECK_KEYS = (
+    "per_file_char_limit",
+    "total_context_char_limit",
+    "max_depth",
+    "git_log_depth",
+    "min_commits",
+)
+
+
+def _normalize_checks(checks):
+    """Coerce numeric check settings to int once, at rubric load.
+
+    A malformed value is dropped with a warning so that check falls back to
+    its default (or fails on its own) instead of aborting the whole run.
+    """
+    for check in checks:
+        for key in _INT_CHECK_KEYS:
+            if key not in check:
+                continue
+            try:
+                check[key] = int(check[key])
+            except (TypeError, ValueError):
+                name = check.get("name", "Unnamed Check")
+                print(f"⚠️  Ignoring invalid {key}={check[key]!r} in check '{name}'")
+                del check[key]
+
+
 def run_analyzer(
     repo_path: str,
     rubric_path: str = "rubric.yaml",
@@ -360,87 +1038,127 @@ def run_analyzer(
     model: Optional[str] = None,
 ):
     """
-    api_key/model optional: if provided, sets a temporary active client for this run.
+    api_key/model optional: if provided, this run uses its own client for them
+    (the process-wide active client is left untouched, so concurrent runs with
+    different keys don't clobber each other). The client is resolved once
+    here and passed down explicitly; if the supplied key's client cannot be
+    built, AI checks fail rather than running on another key.
     """
     if api_key:
-        set_ai_client(api_key, model or GEMINI_MODEL)
-    elif _active_client is None and GOOGLE_API_KEY:
-        # fallback if caller didn't supply
-        set_ai_client(GOOGLE_API_KEY, model or GEMINI_MODEL)
+        client = _make_client(api_key)  # None on failure: never the global one
+    else:
+        if _active_client is None and CFG.api_key:
+            # fallback if caller didn't supply
+            set_ai_client(CFG.api_key, model or CFG.model)
+        client = _active_client
+    model = model or _active_model or CFG.model
 
     if not os.path.isdir(repo_path):
         raise ValueError("Repository path invalid")
     try:
-        with open(rubric_path, "r", encoding="utf-8") as f:
-            rubric = yaml.safe_load(f)
+        # Bytes straight to libyaml, which detects the encoding itself.
+        with open(rubric_path, "rb") as f:
+            rubric = yaml.load(f, Loader=YAML_LOADER)
     except FileNotFoundError:
         raise FileNotFoundError("rubric.yaml not found")
 
-    results = []  # collect dicts
-    total_passed = 0
-    total_partial = 0
-
-    for check in rubric["checks"]:
-        ctype = check.get("type")
-        title = check.get("name", "Unnamed Check")
-
-        if ctype == "ai_check":
-            status, details, score = run_ai_check(check, repo_path)
-            passed_bool = status == "PASS"
-            partial_bool = status == "PARTIAL"
-            if passed_bool:
-                total_passed += 1
-            elif partial_bool:
-                total_partial += 1
-            results.append(
-                {
-                    "name": title,
-                    "type": ctype,
-                    "status": status,
-                    "score": score,
-                    "details": [d.strip() for d in details],
-                }
-            )
-        elif ctype == "file_exists":
-            passed, details = run_file_exists_check(check, repo_path)
-            score = 1.0 if passed else 0.0
-            if passed:
-                total_passed += 1
-            results.append(
-                {
-                    "name": title,
-                    "type": ctype,
-                    "status": "PASS" if passed else "FAIL",
-                    "score": score,
-                    "details": [d.strip() for d in details],
-                }
-            )
-        elif ctype == "git_commit_count":
-            passed, details = run_git_commit_count_check(check, repo_path)
-            score = 1.0 if passed else 0.0
-            if passed:
-                total_passed += 1
-            results.append(
-                {
-                    "name": title,
-                    "type": ctype,
-                    "status": "PASS" if passed else "FAIL",
-                    "score": score,
-                    "details": [d.strip() for d in details],
-                }
+    checks = rubric["checks"]
+    _normalize_checks(checks)
+    results = [None] * len(checks)  # filled in rubric order
+
+    def _record(idx, title, ctype, status, score, details):
+        results[idx] = {
+            "name": title,
+            "type": ctype,
+            "status": status,
+            "score": score,
+            "details": [d.strip() for d in details],
+        }
+
+    # AI checks are network-bound and independent: dispatch them all up front so
+    # their latencies overlap (the shared RateLimiter still caps calls/minute),
+    # then run the cheap local checks inline while the AI calls are in flight.
+    ai_jobs = [
+        (idx, check)
+        for idx, check in enumerate(checks)
+        if check.get("type") == "ai_check"
+    ]
+    git = GitSession(repo_path)
+    repo_index = build_repo_index(repo_path, git)
+    workers = max(1, min(len(ai_jobs), CFG.max_per_minute))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        ai_futures = [
+            (
+                idx,
+                check,
+                pool.submit(
+                    run_ai_check,
+                    check,
+                    repo_path,
+                    git=git,
+                    repo_index=repo_index,
+                    client=client,
+                    model=model,
+                ),
             )
-        else:
-            results.append(
-                {
-                    "name": title,
-                    "type": ctype,
-                    "status": "FAIL",
-                    "score": 0.0,
-                    "details": [f"FAILED: Unknown check type '{ctype}'."],
-                }
+            for idx, check in ai_jobs
+        ]
+
+        for idx, check in enumerate(checks):
+            ctype = check.get("type")
+            title = check.get("name", "Unnamed Check")
+
+            if ctype == "ai_check":
+                continue
+            elif ctype == "file_exists":
+                passed, details = run_file_exists_check(check, repo_path, repo_index)
+                _record(
+                    idx,
+                    title,
+                    ctype,
+                    "PASS" if passed else "FAIL",
+                    1.0 if passed else 0.0,
+                    details,
+                )
+            elif ctype == "git_commit_count":
+                passed, details = run_git_commit_count_check(check, repo_path, git)
+                _record(
+                    idx,
+                    title,
+                    ctype,
+                    "PASS" if passed else "FAIL",
+                    1.0 if passed else 0.0,
+                    details,
+                )
+            else:
+                _record(
+                    idx,
+                    title,
+                    ctype,
+                    "FAIL",
+                    0.0,
+                    [f"FAILED: Unknown check type '{ctype}'."],
+                )
+
+        for idx, check, future in ai_futures:
+            status, details, score = future.result()
+            _record(
+                idx,
+                check.get("name", "Unnamed Check"),
+                "ai_check",
+                status,
+                score,
+                details,
             )
 
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    with _cache_lock:
+        _ensure_cache_loaded()  # the returned cache is persisted by the API
+    _save_cache()
+
+    total_passed = sum(1 for r in results if r["status"] == "PASS")
+    total_partial = sum(1 for r in results if r["status"] == "PARTIAL")
+
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
 
     # Markdown report
     lines = [
@@ -480,6 +1198,32 @@ def run_analyzer(
     return md_report, json_obj, _ai_cache, total_passed, len(results)
 
 
+def _write_if_changed(path: str, text: str, volatile_prefix: str) -> bool:
+    """Write text to path unless the file already holds the same report.
+
+    Lines starting with volatile_prefix (the generation timestamp) are ignored
+    in the comparison, so re-running on an unchanged repo keeps the existing
+    file and its mtime. Returns True if the file was written.
+    """
+
+    def _stable(s: str):
+        return [
+            line
+            for line in s.splitlines()
+            if not line.lstrip().startswith(volatile_prefix)
+        ]
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if _stable(f.read()) == _stable(text):
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass  # missing or unreadable: just write it
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
 def main():
     repo_path = input("Enter the full path to the cloned repository: ")
     try:
@@ -489,14 +1233,18 @@ def main():
     except Exception as e:
         print(f"❌ ERROR: {e}")
         return
-    md_path = os.getenv("REPORT_MD_PATH", "analysis_report.md")
-    json_path = os.getenv("REPORT_JSON_PATH", "analysis_report.json")
+    md_path = CFG.md_path
+    json_path = CFG.json_path
     try:
-        with open(md_path, "w", encoding="utf-8") as f:
-            f.write(md_report)
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(json_obj, f, indent=2)
-        print(f"Saved {md_path}, {json_path}")
+        reports = (
+            (md_path, md_report, "Generated: "),
+            (json_path, _json_pretty(json_obj), '"generated_at": '),
+        )
+        for path, text, volatile_prefix in reports:
+            if _write_if_changed(path, text, volatile_prefix):
+                print(f"Saved {path}")
+            else:
+                print(f"Unchanged: {path}")
         print(f"Summary: {total_passed}/{total_checks} passed.")
     except Exception as e:
         print(f"⚠️  Could not write report files: {e}")
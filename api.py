@@ -7,7 +7,7 @@ import shutil
 import logging
 import traceback
 import json
-from datetime import datetime
+import time
 from flask import Flask, request, jsonify
 from persistence_single import (
     init_db,
@@ -19,7 +19,7 @@ from persistence_single import (
     update_run_metadata,
     list_cohorts,
 )
-from analyzer import run_analyzer, ANALYZER_TOOL_VERSION
+from analyzer import run_analyzer, ANALYZER_TOOL_VERSION, GIT_EXECUTABLE
 from final_scorer import run_final_scorer, SCORER_TOOL_VERSION
 from flask_cors import CORS
 from ai_keys import get_next_key
@@ -65,11 +65,56 @@ logger.info(
 )
 JOB_QUEUE: "queue.Queue[int]" = queue.Queue()
 
+# Runs are I/O-bound (clone, Gemini calls), so several workers drain the queue
+# concurrently; the analyzer's shared RateLimiter still caps AI calls/minute.
+API_WORKERS = max(1, int(os.getenv("API_WORKERS", "4")))
 WORKER_STARTED = False
+_worker_lock = threading.Lock()
+# Run ids currently being processed, so a run enqueued twice is worked once.
+_active_runs = set()
+CLONE_PROBE_TIMEOUT = float(os.getenv("CLONE_PROBE_TIMEOUT", "10"))
+
+
+def probe_remote(github_url: str):
+    """Fail fast on unreachable/nonexistent/private repos before cloning.
+
+    `ls-remote --exit-code <url> HEAD` transfers only the ref advertisement,
+    and GIT_TERMINAL_PROMPT=0 makes an auth-required URL fail instead of
+    blocking the worker on a credential prompt. Raises CalledProcessError or
+    TimeoutExpired.
+    """
+    subprocess.run(
+        [GIT_EXECUTABLE, "ls-remote", "--exit-code", github_url, "HEAD"],
+        check=True,
+        capture_output=True,
+        timeout=CLONE_PROBE_TIMEOUT,
+        close_fds=False,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
 
 
 def clone_repo(github_url: str, dest: str):
-    subprocess.run(["git", "clone", "--depth", "50", github_url, dest], check=True)
+    # The analyzer reads the checked-out tree plus `git log --oneline` (rubric
+    # depth <= 50), so history is kept shallow and blob-less: only HEAD's
+    # blobs are downloaded, at checkout. LFS pointers are left unsmudged.
+    # close_fds=False + absolute git path keeps these calls on the posix_spawn
+    # fast path; don't add cwd=/preexec_fn=/shell=True (use `-C` instead).
+    subprocess.run(
+        [
+            GIT_EXECUTABLE,
+            "clone",
+            "--depth",
+            "50",
+            "--filter=blob:none",
+            "--single-branch",
+            "--no-tags",
+            github_url,
+            dest,
+        ],
+        check=True,
+        close_fds=False,
+        env={**os.environ, "GIT_LFS_SKIP_SMUDGE": "1"},
+    )
 
 
 def worker_loop():
@@ -77,91 +122,139 @@ def worker_loop():
         run_id = JOB_QUEUE.get()
         if run_id is None:
             break
-        run_row = get_run(run_id)
-        if not run_row:
-            continue
-        if run_row.get("status") not in ("PENDING", "ERROR", "QUEUED"):
-            continue
-        update_run_metadata(run_id, status="RUNNING")
-        repo_url = run_row["github_url"]
+        with _worker_lock:
+            claimed = run_id not in _active_runs
+            if claimed:
+                _active_runs.add(run_id)
+        if claimed:
+            try:
+                process_run(run_id)
+            except Exception:
+                # Keep the worker alive (e.g. a DB error before process_run's
+                # own handler); the run stays in its current status.
+                logger.exception("Worker failed on run %s", run_id)
+            finally:
+                with _worker_lock:
+                    _active_runs.discard(run_id)
+        JOB_QUEUE.task_done()
+
+
+def process_run(run_id: int):
+    # Everything process_run reads; skips the scorer JSON and AI cache blobs.
+    run_row = get_run(
+        run_id,
+        columns=(
+            "id",
+            "status",
+            "github_url",
+            "analyzer_md",
+            "analyzer_json",
+            "final_scorer_md",
+        ),
+    )
+    if not run_row:
+        return
+    if run_row.get("status") not in ("PENDING", "ERROR", "QUEUED"):
+        return
+    update_run_metadata(run_id, status="RUNNING")
+    repo_url = run_row["github_url"]
+    tmpdir = None
+    try:
+        # Pick API key for this run (one key per repo run)
+        key_label, api_key = get_next_key()
+        update_run_metadata(run_id, status="RUNNING", api_key_label=key_label)
+
+        probe_remote(repo_url)
         tmpdir = tempfile.mkdtemp(prefix=f"run_{run_id}_")
-        try:
-            # Pick API key for this run (one key per repo run)
-            key_label, api_key = get_next_key()
-            update_run_metadata(run_id, status="RUNNING", api_key_label=key_label)
-
-            clone_repo(repo_url, tmpdir)
-            # capture branch + commit
-            branch = subprocess.check_output(
-                ["git", "-C", tmpdir, "rev-parse", "--abbrev-ref", "HEAD"], text=True
-            ).strip()
-            commit = subprocess.check_output(
-                ["git", "-C", tmpdir, "rev-parse", "HEAD"], text=True
-            ).strip()
-            # Run analyzer unless already present
-            json_obj = None
-            if not run_row.get("analyzer_md"):
-                md_report, json_obj, cache, total_passed, total_checks = run_analyzer(
-                    tmpdir,
-                    api_key=api_key,
-                )
-                store_analyzer_outputs(
-                    run_id,
-                    md_report,
-                    json_obj,
-                    cache,
-                    commit,
-                    branch,
-                    ANALYZER_TOOL_VERSION,
-                )
-                run_row = get_run(run_id) or run_row
-            else:
-                # Parse stored analyzer JSON so scorer invocation uniform
-                try:
-                    stored = run_row.get("analyzer_json")
-                    if stored:
-                        json_obj = json.loads(stored)
-                except Exception:
-                    json_obj = None
-            # Run scorer unless already present
-            if not run_row.get("final_scorer_md") and json_obj is not None:
-                scorer_md, scorer_json, scorer_cache, overall = run_final_scorer(
-                    json_obj,
-                    is_json=True,
-                    api_key=api_key,
-                )
-                store_scorer_outputs(
-                    run_id,
-                    scorer_md,
-                    scorer_json,
-                    scorer_cache,
-                    overall,
-                    SCORER_TOOL_VERSION,
-                )
-            update_run_metadata(run_id, status="DONE")
-        except Exception as e:
-            tb = traceback.format_exc(limit=20)
-            msg = f"Worker failure run_id={run_id} repo={repo_url} error={e}\n{tb}"
-            logger.error(msg)
-            # Fallback direct append in case handlers failed
+        clone_repo(repo_url, tmpdir)
+        # capture commit + branch in one git call (options apply to the
+        # revisions after them, so this prints the sha, then the branch)
+        commit, branch = subprocess.check_output(
+            [
+                GIT_EXECUTABLE,
+                "-C",
+                tmpdir,
+                "rev-parse",
+                "HEAD",
+                "--abbrev-ref",
+                "HEAD",
+            ],
+            text=True,
+            close_fds=False,
+        ).split()
+        # Run analyzer unless already present
+        json_obj = None
+        if not run_row.get("analyzer_md"):
+            md_report, json_obj, cache, total_passed, total_checks = run_analyzer(
+                tmpdir,
+                api_key=api_key,
+            )
+            store_analyzer_outputs(
+                run_id,
+                md_report,
+                json_obj,
+                cache,
+                commit,
+                branch,
+                ANALYZER_TOOL_VERSION,
+            )
+            # Keep the row current locally; scorer columns are untouched by
+            # store_analyzer_outputs, so no need to re-query.
+            run_row.update(
+                analyzer_md=md_report,
+                commit_hash=commit,
+                branch_name=branch,
+                status="ANALYZED",
+            )
+        else:
+            # Parse stored analyzer JSON so scorer invocation uniform
             try:
-                with open(ERROR_LOG_PATH, "a", encoding="utf-8") as _ef:
-                    _ef.write(f"{datetime.utcnow().isoformat()}Z {msg}\n")
+                stored = run_row.get("analyzer_json")
+                if stored:
+                    json_obj = json.loads(stored)
             except Exception:
-                pass
-            update_run_metadata(
-                run_id, status="ERROR", scorer_tool_version=str(e)[:240]
+                json_obj = None
+        # Run scorer unless already present
+        if not run_row.get("final_scorer_md") and json_obj is not None:
+            scorer_md, scorer_json, scorer_cache, overall = run_final_scorer(
+                json_obj,
+                is_json=True,
+                api_key=api_key,
+            )
+            store_scorer_outputs(
+                run_id,
+                scorer_md,
+                scorer_json,
+                scorer_cache,
+                overall,
+                SCORER_TOOL_VERSION,
             )
-        finally:
+        update_run_metadata(run_id, status="DONE")
+    except Exception as e:
+        tb = traceback.format_exc(limit=20)
+        msg = f"Worker failure run_id={run_id} repo={repo_url} error={e}\n{tb}"
+        logger.error(msg)
+        # Fallback direct append in case handlers failed
+        try:
+            with open(ERROR_LOG_PATH, "a", encoding="utf-8") as _ef:
+                stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+                _ef.write(f"{stamp}Z {msg}\n")
+        except Exception:
+            pass
+        update_run_metadata(run_id, status="ERROR", scorer_tool_version=str(e)[:240])
+    finally:
+        if tmpdir:
             shutil.rmtree(tmpdir, ignore_errors=True)
-        JOB_QUEUE.task_done()
 
 
 def ensure_worker():
     global WORKER_STARTED
-    if not WORKER_STARTED:
-        t = threading.Thread(target=worker_loop, daemon=True)
-        t.start()
+    with _worker_lock:
+        if WORKER_STARTED:
+            return
+        for i in range(API_WORKERS):
+            t = threading.Thread(target=worker_loop, name=f"worker-{i}", daemon=True)
+            t.start()
         WORKER_STARTED = True
 
 
@@ -196,7 +289,7 @@ def get_run_endpoint(run_id: int):
 
 @app.route("/runs/<int:run_id>/enqueue", methods=["POST"])
 def enqueue_run(run_id: int):
-    row = get_run(run_id)
+    row = get_run(run_id, columns=("id",))
     if not row:
         return jsonify({"error": "not found"}), 404
     ensure_worker()
@@ -1,16 +1,45 @@
 import os
 import sys
+import atexit
 from typing import Optional
 import yaml
 import json
 import re
 import time
 import hashlib
-from datetime import datetime
+import random
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from google import genai
 
+# orjson when installed (same optional speedup as analyzer.py); stdlib json
+# otherwise. Prompt text is still built with json.dumps so cache keys and
+# prompts stay byte-identical.
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def _json_line(obj) -> bytes:
+    """Compact single-line JSON as UTF-8 bytes, newline-terminated."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+def _json_pretty(obj) -> str:
+    """Two-space indented JSON, as written to the report file."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 load_dotenv()
 
 SCORER_TOOL_VERSION = "scorer-0.1.0"
@@ -24,35 +53,133 @@ OUTPUT_JSON = os.getenv("FINAL_SCORE_JSON", "final_scores.json")
 STRICT = True  # Fail fast if parsing fails
 VERBOSE = os.getenv("FINAL_SCORER_VERBOSE", "1") == "1"
 MAX_ANALYZER_CHARS = int(os.getenv("FINAL_SCORER_MAX_ANALYZER_CHARS", "35000"))
-CACHE_PATH = os.getenv("FINAL_SCORER_CACHE", ".final_score_cache.json")
+CACHE_PATH = os.getenv("FINAL_SCORER_CACHE", ".final_score_cache.jsonl")
+FSYNC = os.getenv("FINAL_SCORER_FSYNC", "0") == "1"  # fsync each cache append
 RETRY_ATTEMPTS = int(os.getenv("FINAL_SCORER_RETRIES", "4"))
 BASE_DELAY = float(os.getenv("FINAL_SCORER_BASE_DELAY", "2"))
 RATE_LIMIT_SECONDS = float(
     os.getenv("FINAL_SCORER_MIN_INTERVAL", "1.0")
 )  # min gap between AI calls
 DO_SUMMARY = os.getenv("FINAL_SCORER_SUMMARY", "1") != "0"
-
-_last_call_time = 0.0
+CONCURRENCY = max(1, int(os.getenv("FINAL_SCORER_CONCURRENCY", "6")))
+MAX_DELAY = float(os.getenv("FINAL_SCORER_MAX_DELAY", "30"))  # backoff ceiling
+# Score all AI criteria with one request (analyzer output sent once); any
+# criterion missing or invalid in the reply is re-scored individually.
+BATCH = os.getenv("FINAL_SCORER_BATCH", "0") == "1"
+# Whole-run results keyed by inputs, so identical re-runs skip all AI calls
+# ("" disables).
+RUNS_DIR = os.getenv("FINAL_SCORER_RUNS_DIR", ".final_score_runs")
+RUNS_MAX = max(1, int(os.getenv("FINAL_SCORER_RUNS_MAX", "200")))  # files kept
+
+# Start time reserved for the next AI call; each caller claims a slot under the
+# lock and sleeps outside it, so concurrent workers stay RATE_LIMIT_SECONDS apart.
+_next_call_at = 0.0
+_rate_lock = Lock()
 _cache_lock = Lock()
+_resp_cache = {}
+_cache_log_lines = 0  # lines in the append-only cache log
+# True when the log on disk lacks entries held in memory (a failed append)
+# and must be rewritten at exit.
+_cache_dirty = False
+
+
+def _load_cache():
+    """Replay the JSONL cache log ({"k": key, "v": text} per line).
+
+    Legacy whole-file .json snapshots are not read: their keys were built
+    from the old prompt layout and no longer match any request.
+    """
+    global _cache_log_lines
+    if not os.path.exists(CACHE_PATH):
+        return
+    with open(CACHE_PATH, "rb") as f:
+        for line in f:
+            try:
+                obj = _json_loads(line)
+            except ValueError:
+                continue  # torn write from an interrupted append
+            _cache_log_lines += 1
+            if isinstance(obj, dict) and obj.keys() == {"k", "v"}:
+                _resp_cache[obj["k"]] = obj["v"]
+
+
+def _append_cache_entry(key: str, text: str):
+    """Append one entry to the log; caller holds _cache_lock.
+
+    One os.write on an O_APPEND descriptor, so lines from concurrent scorer
+    processes never interleave.
+    """
+    global _cache_log_lines
+    line = _json_line({"k": key, "v": text})
+    fd = os.open(CACHE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+        if FSYNC:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    _cache_log_lines += 1
+
+
+def _compact_cache():
+    """Rewrite the log from memory if it is missing entries or mostly stale."""
+    global _cache_log_lines, _cache_dirty
+    try:
+        with _cache_lock:
+            if not _cache_dirty and _cache_log_lines <= 2 * len(_resp_cache):
+                return
+            tmp_path = f"{CACHE_PATH}.tmp"
+            with open(tmp_path, "wb") as f:
+                for k, v in _resp_cache.items():
+                    f.write(_json_line({"k": k, "v": v}))
+            os.replace(tmp_path, CACHE_PATH)
+            _cache_log_lines = len(_resp_cache)
+            _cache_dirty = False
+    except Exception:
+        pass  # non-critical
+
+
 try:
-    if os.path.exists(CACHE_PATH):
-        with open(CACHE_PATH, "r", encoding="utf-8") as _cf:
-            _resp_cache = json.load(_cf)
-    else:
-        _resp_cache = {}
+    _load_cache()
 except Exception:
-    _resp_cache = {}
+    _resp_cache.clear()
+atexit.register(_compact_cache)
 
 SCORE_PATTERN = re.compile(r"SCORE:\s*([0-1](?:\.\d)?)", re.IGNORECASE)
 JUST_PATTERN = re.compile(r"JUSTIFICATION:\s*(.+)", re.IGNORECASE | re.DOTALL)
+# Expected layout (justification right after the score) in one scan; the two
+# patterns above remain the fallback for anything else.
+SCORE_JUST_PATTERN = re.compile(
+    r"SCORE:\s*([0-1](?:\.\d)?)(?:\s*JUSTIFICATION:\s*(.+))?",
+    re.IGNORECASE | re.DOTALL,
+)
+# "Retry-After: 12" style hints, or the RPC RetryInfo "retryDelay": "12s".
+RETRY_HINT_PATTERN = re.compile(
+    r"retry[_ -]?(?:after|delay)\W*(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+_jitter = random.SystemRandom()
 
 # Allowed discrete increments 0.0 .. 1.0 step 0.1
 ALLOWED_SCORES = {f"{i/10:.1f}" for i in range(0, 11)}
 
 
+# libyaml's C parser when PyYAML was built with it; same semantics as safe_load.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_rubric_cache = None  # ((mtime_ns, size), criteria) of the last parse
+
+
 def read_rubric():
-    with open(RUBRIC_PATH, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    """Rubric criteria, re-parsed only when the file's mtime/size changes."""
+    global _rubric_cache
+    st = os.stat(RUBRIC_PATH)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _rubric_cache
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(RUBRIC_PATH, "rb") as f:
+        data = yaml.load(f, Loader=YAML_LOADER)
+    _rubric_cache = (stamp, data["criteria"])
     return data["criteria"]
 
 
@@ -67,51 +194,180 @@ def load_overrides():
 
 
 def parse_ai_response(raw: str):
-    score_match = SCORE_PATTERN.search(raw)
-    just_match = JUST_PATTERN.search(raw)
+    # The optional group always matches, so this finds the same first SCORE
+    # as SCORE_PATTERN would.
+    score_match = SCORE_JUST_PATTERN.search(raw)
     if not score_match:
         raise ValueError(f"Could not parse SCORE from: {raw[:120]}...")
     score_str = score_match.group(1)
     if score_str not in ALLOWED_SCORES:
         raise ValueError(f"Score {score_str} not allowed (must be 0.0..1.0 step 0.1)")
     score = float(score_str)
-    justification = just_match.group(1).strip() if just_match else "(no justification)"
+    justification = score_match.group(2)
+    if justification is None:
+        just_match = JUST_PATTERN.search(raw)
+        justification = just_match.group(1) if just_match else None
+    justification = (
+        justification.strip() if justification is not None else "(no justification)"
+    )
     # Trim justification first line only (avoid huge repeats); keep up to 350 chars
     if len(justification) > 350:
         justification = justification[:347] + "..."
     return score, justification
 
 
-def _hash_key(content: str) -> str:
-    return hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
+# Prompt templates (str.format fields). They feed the whole-run cache key, so
+# any wording change here invalidates stored run results automatically.
+SHARED_PREFIX_TEMPLATE = """You are a reviewer assigning a numeric score. Follow instructions precisely.\n\nAnalyzer Output (possibly truncated):\n----------------\n{analyzer_output}\n----------------\n"""
+CRITERION_PROMPT_TEMPLATE = """Criterion Name: {name}\nInstructions:\n{instructions}\nRules:\n- Choose ONLY one allowed score: 0.0 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8 0.9 1.0\n- Output EXACTLY two lines:\nSCORE: <value>\nJUSTIFICATION: <concise>\nIf evidence is weak, choose a conservative score.\n"""
+BATCH_BLOCK_TEMPLATE = (
+    "### Criterion id: {cid}\nCriterion Name: {name}\nInstructions:\n{instructions}"
+)
+BATCH_PROMPT_TEMPLATE = """You are a reviewer assigning numeric scores to several criteria. Follow instructions precisely.\n\nAnalyzer Output (possibly truncated):\n----------------\n{analyzer_output}\n----------------\n\nCriteria:\n{criteria_text}\n\nRules:\n- Score every criterion independently, using its own instructions (ignore their per-criterion output format).\n- Choose ONLY one allowed score per criterion: 0.0 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8 0.9 1.0\n- Output ONLY a JSON array, one object per criterion:\n[{{"id": "<criterion id>", "score": <value>, "justification": "<concise>"}}]\nIf evidence is weak, choose a conservative score.\n"""
+SUMMARY_PROMPT_TEMPLATE = """You are an experienced software project reviewer. Produce ONE cohesive overall review comment.\nData available:\n(1) Per-criterion scores (0.0-1.0):\n{score_lines}\nOverall weighted score: {overall:.2f}\n(2) The underlying analyzer output already informed those scores (not repeated here).\nInstructions:\n- Start with a single concise summary sentence capturing overall health.\n- Then provide a short bullet list: Strengths, Risks, Next Steps (each 1-3 bullets).\n- Prioritize actionable technical improvements (security, docs, robustness) over cosmetic. If security issues like leaked credentials arise, address them.\n- Word limit: 160 words total.\nFormat:\nStrengths:\n- ...\nRisks:\n- ...\nNext Steps:\n- ...\nReturn only the comment. Do NOT add extra labels beyond the specified headings.\n"""
+
+# Pipes would break the markdown table cell a justification sits in.
+_PIPE_TR = str.maketrans("|", "/")
+
+FENCED_JSON_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+
+
+def batch_prompt(jobs, analyzer_output: str) -> str:
+    """One prompt scoring every queued (idx, cid, name, weight, item, prompt) job."""
+    blocks = []
+    for _idx, cid, name, _weight, item, _prompt in jobs:
+        blocks.append(
+            BATCH_BLOCK_TEMPLATE.format(cid=cid, name=name, instructions=item["prompt"])
+        )
+    criteria_text = "\n\n".join(blocks)
+    return BATCH_PROMPT_TEMPLATE.format(
+        analyzer_output=analyzer_output, criteria_text=criteria_text
+    )
+
+
+def parse_batch_response(raw: str, wanted_ids):
+    """Map criterion id -> (score, justification, raw_entry) from a batch reply.
+
+    Entries with an unknown id or a score off the 0.1 grid are dropped, so the
+    caller can fall back to per-criterion calls for them. Returns {} when the
+    reply is not a JSON array.
+    """
+    fenced = FENCED_JSON_PATTERN.search(raw)
+    body = fenced.group(1) if fenced else raw[raw.find("[") : raw.rfind("]") + 1]
+    try:
+        entries = json.loads(body)
+    except ValueError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.get("id") not in wanted_ids:
+            continue
+        try:
+            score_str = f"{float(entry.get('score')):.1f}"
+        except (TypeError, ValueError):
+            continue
+        if (
+            score_str not in ALLOWED_SCORES
+            or abs(float(score_str) - float(entry["score"])) > 1e-9
+        ):
+            continue
+        justification = str(entry.get("justification") or "(no justification)")
+        justification = justification.strip()
+        if len(justification) > 350:
+            justification = justification[:347] + "..."
+        parsed[entry["id"]] = (float(score_str), justification, json.dumps(entry))
+    return parsed
+
+
+# Keys are sha256(model + "\n" + full prompt). Criterion prompts lead with
+# the shared analyzer output, so the cache effectively reset when that layout
+# was introduced; older caches are not migrated. Copying a pristine hasher
+# skips constructing a new one on every call.
+_SHA256_PROTO = hashlib.sha256()
+
+
+def _hash_key(content: str, base=None) -> str:
+    """SHA-256 of ``content``, continuing from ``base`` (a prefix hasher) if given."""
+    h = (base or _SHA256_PROTO).copy()
+    h.update(content.encode("utf-8", errors="ignore"))
+    return h.hexdigest()
+
 
+def _prefix_hasher(model: str, prefix: str):
+    """Hasher pre-fed with ``model + "\n" + prefix`` for keys sharing that prefix."""
+    h = _SHA256_PROTO.copy()
+    h.update((model + "\n" + prefix).encode("utf-8", errors="ignore"))
+    return h
+
+
+def _wait_for_call_slot():
+    global _next_call_at
+    with _rate_lock:
+        now = time.monotonic()
+        start = max(now, _next_call_at)
+        _next_call_at = start + RATE_LIMIT_SECONDS
+    if start > now:
+        time.sleep(start - now)
+
+
+def _retry_after_hint(exc: Exception) -> float:
+    """Seconds the server asked us to wait, or 0.0 if it gave no hint.
+
+    Checks an HTTP Retry-After header on the error's response (seconds or an
+    HTTP date), then a retry-after / RPC retryDelay value in the message.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = None
+    if headers is not None:
+        try:
+            value = headers.get("retry-after")
+        except Exception:
+            value = None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(value)
+                return max(0.0, when.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    match = RETRY_HINT_PATTERN.search(str(exc))
+    return float(match.group(1)) if match else 0.0
 
-def safe_ai_call(client, model: str, prompt: str):
-    global _last_call_time
-    cache_key = _hash_key(model + "\n" + prompt)
+
+def safe_ai_call(client, model: str, prompt: str, prefix: str = "", prefix_hash=None):
+    """Send ``prefix + prompt``, cached under sha256(model + "\n" + prefix + prompt).
+
+    ``prefix_hash`` (from ``_prefix_hasher(model, prefix)``) lets callers that
+    share a large prefix hash it once; the full prompt is then only built on a
+    cache miss.
+    """
+    global _cache_dirty
+    if prefix_hash is None:
+        cache_key = _hash_key(model + "\n" + prefix + prompt)
+    else:
+        cache_key = _hash_key(prompt, prefix_hash)
     with _cache_lock:
         if cache_key in _resp_cache:
             if VERBOSE:
                 print(f"  - (cache hit)")
             return _resp_cache[cache_key]
     for attempt in range(1, RETRY_ATTEMPTS + 1):
-        # simple rate limiting gap
-        gap = time.time() - _last_call_time
-        if gap < RATE_LIMIT_SECONDS:
-            time.sleep(RATE_LIMIT_SECONDS - gap)
+        _wait_for_call_slot()
         try:
             if VERBOSE:
                 print(f"  - AI request attempt {attempt}/{RETRY_ATTEMPTS}...")
-            resp = client.models.generate_content(model=model, contents=prompt)
-            _last_call_time = time.time()
+            resp = client.models.generate_content(model=model, contents=prefix + prompt)
             text = (resp.text or "").strip()
             with _cache_lock:
                 _resp_cache[cache_key] = text
                 try:
-                    with open(CACHE_PATH, "w", encoding="utf-8") as _cf:
-                        json.dump(_resp_cache, _cf)
-                except Exception:
-                    pass
+                    _append_cache_entry(cache_key, text)
+                except OSError:
+                    _cache_dirty = True  # rewritten in full at exit
             return text
         except Exception as e:
             err = str(e).lower()
@@ -120,7 +376,14 @@ def safe_ai_call(client, model: str, prompt: str):
                 for k in ["timeout", "rate", "429", "overload", "unavail", "503"]
             )
             if retryable and attempt < RETRY_ATTEMPTS:
-                delay = BASE_DELAY * (2 ** (attempt - 1))
+                # Full jitter de-synchronizes workers sharing the quota; a
+                # server-provided Retry-After / retryDelay is a lower bound,
+                # but never past MAX_DELAY so one hint can't stall a worker.
+                backoff = min(MAX_DELAY, BASE_DELAY * (2 ** (attempt - 1)))
+                delay = min(
+                    MAX_DELAY,
+                    max(_retry_after_hint(e), _jitter.uniform(0, backoff)),
+                )
                 if VERBOSE:
                     print(f"  - Retryable error: {e} (sleep {delay:.1f}s)")
                 time.sleep(delay)
@@ -128,6 +391,145 @@ def safe_ai_call(client, model: str, prompt: str):
             raise
 
 
+# Clients are kept per API key so their HTTP connection pools (and TLS
+# sessions) are reused across runs.
+_clients = {}
+_clients_lock = Lock()
+
+
+def _get_client(api_key: str):
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = genai.Client(api_key=api_key)
+        return client
+
+
+def _render_report(results, overall, summary_future=None, overall_comment=None):
+    """Build (markdown, json) for scored results.
+
+    A pending ``summary_future`` is only joined after the table rows are
+    formatted, so the summary request overlaps that work.
+    """
+    table_lines = [
+        "| ID | Criterion | Score | Weight | Justification | Source |",
+        "|----|-----------|-------|--------|---------------|--------|",
+    ]
+    for r in results:
+        table_lines.append(
+            f"| {r['id']} | {r['name']} | {r['score']:.1f} | {r['weight']:.1f} | {r['justification'].translate(_PIPE_TR)} | {r['source']} |"
+        )
+
+    if summary_future is not None:
+        try:
+            overall_comment = (summary_future.result() or "").strip()
+        except Exception as e:
+            overall_comment = f"(Summary generation failed: {e})"
+
+    # One timestamp for both outputs, so the report and JSON agree.
+    now = datetime.now(timezone.utc)
+
+    # Markdown table
+    md_lines = []
+    md_lines.append(f"# Final Scoring Report\n")
+    md_lines.append(f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n")
+    if overall_comment:
+        md_lines.append("\n### Overall Review Comment\n")
+        md_lines.append(overall_comment + "\n\n")
+
+    md_lines.append(f"Overall Score: {overall:.2f} (weighted)\n")
+    md_lines.extend(table_lines)
+
+    md_report = "\n".join(md_lines) + "\n"
+    out_json = {
+        "generated_at": now.isoformat().replace("+00:00", "Z"),
+        "overall_score": round(overall, 2),
+        "criteria": results,
+        "overall_comment": overall_comment,
+    }
+    return md_report, out_json
+
+
+def _run_cache_key(model, criteria, overrides, analyzer_output: str) -> str:
+    """Everything that determines a run's results: inputs, model, mode and the
+    prompt templates themselves (so a wording change needs no version bump)."""
+    settings = json.dumps(
+        [
+            SCORER_TOOL_VERSION,
+            model,
+            DO_SUMMARY,
+            BATCH,
+            SHARED_PREFIX_TEMPLATE,
+            CRITERION_PROMPT_TEMPLATE,
+            BATCH_BLOCK_TEMPLATE,
+            BATCH_PROMPT_TEMPLATE,
+            SUMMARY_PROMPT_TEMPLATE,
+            criteria,
+            overrides,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return _hash_key(settings + "\n" + analyzer_output)
+
+
+def _load_run_result(run_key: str):
+    if not RUNS_DIR:
+        return None
+    path = os.path.join(RUNS_DIR, f"{run_key}.json")
+    try:
+        with open(path, "rb") as f:
+            cached = _json_loads(f.read())
+        if not (isinstance(cached, dict) and "criteria" in cached):
+            return None
+        os.utime(path)  # recently used: pruned last
+        return cached
+    except (OSError, ValueError):
+        return None
+
+
+def _prune_run_results():
+    """Keep only the RUNS_MAX most recently used run files."""
+    try:
+        with os.scandir(RUNS_DIR) as entries:
+            runs = [
+                (e.stat().st_mtime, e.path)
+                for e in entries
+                if e.name.endswith(".json") and e.is_file()
+            ]
+    except OSError:
+        return
+    if len(runs) <= RUNS_MAX:
+        return
+    runs.sort()
+    for _mtime, path in runs[: len(runs) - RUNS_MAX]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # removed concurrently
+
+
+def _save_run_result(run_key: str, out_json, overall: float):
+    """Store a finished run (tmp file + os.replace, so readers never see a torn file)."""
+    if not RUNS_DIR:
+        return
+    entry = {
+        "overall": overall,
+        "criteria": out_json["criteria"],
+        "overall_comment": out_json["overall_comment"],
+    }
+    path = os.path.join(RUNS_DIR, f"{run_key}.json")
+    try:
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_json_line(entry))
+        os.replace(tmp_path, path)
+    except OSError:
+        return  # non-critical
+    _prune_run_results()
+
+
 def run_final_scorer(
     analyzer_source,
     is_json: bool = False,
@@ -147,7 +549,7 @@ def run_final_scorer(
             analyzer_obj = analyzer_source
         else:
             try:
-                analyzer_obj = json.loads(analyzer_source)
+                analyzer_obj = _json_loads(analyzer_source)
             except Exception:
                 analyzer_obj = None
         if isinstance(analyzer_obj, dict):
@@ -179,7 +581,9 @@ def run_final_scorer(
     if len(analyzer_output) > MAX_ANALYZER_CHARS:
         if VERBOSE:
             print(
-                f"Truncating analyzer output from {len(analyzer_output)} to {MAX_ANALYZER_CHARS} chars"
+                # main() reads at most MAX_ANALYZER_CHARS + 1 chars of text
+                # input, so the full input length is not known here.
+                f"Analyzer output exceeds {MAX_ANALYZER_CHARS} chars; truncating"
             )
         analyzer_output = analyzer_output[:MAX_ANALYZER_CHARS] + "\n... (truncated)"
 
@@ -195,18 +599,41 @@ def run_final_scorer(
 
     overrides = load_overrides()
 
-    # Init AI client
-    ak = api_key or os.getenv("GEMINI_API_KEY")
-    if not ak:
-        raise RuntimeError("Missing API key (none passed and GEMINI_API_KEY unset).")
-    client = genai.Client(api_key=ak)
     use_model = model_override or MODEL
+    run_key = _run_cache_key(use_model, criteria, overrides, analyzer_output)
+    cached = _load_run_result(run_key)
+    if cached is not None:
+        if VERBOSE:
+            print("Reusing results of an identical earlier run")
+        md_report, out_json = _render_report(
+            cached["criteria"],
+            cached["overall"],
+            overall_comment=cached.get("overall_comment"),
+        )
+        return md_report, out_json, _resp_cache, cached["overall"]
+
+    # Init AI client, unless overrides cover every criterion and there is no
+    # summary to write (then no key is needed and no client is created)
+    needs_ai = DO_SUMMARY or any(item["id"] not in overrides for item in criteria)
+    client = None
+    if needs_ai:
+        ak = api_key or os.getenv("GEMINI_API_KEY")
+        if not ak:
+            raise RuntimeError(
+                "Missing API key (none passed and GEMINI_API_KEY unset)."
+            )
+        client = _get_client(ak)
+    # The analyzer output leads every criterion prompt, so its hash is
+    # computed once and each call only hashes its short criterion suffix.
+    shared_prefix = SHARED_PREFIX_TEMPLATE.format(analyzer_output=analyzer_output)
+    prefix_hash = _prefix_hasher(use_model, shared_prefix)
 
-    results = []
+    results = [None] * len(criteria)  # filled in rubric order
     total_weight = 0.0
     weighted_sum = 0.0
+    jobs = []
 
-    for item in criteria:
+    for idx, item in enumerate(criteria):
         cid = item["id"]
         name = item.get("name", cid)
         weight = float(item.get("weight", 1))
@@ -216,28 +643,73 @@ def run_final_scorer(
         if cid in overrides:
             score = float(overrides[cid])
             just = "(override applied)"
-            results.append(
-                {
-                    "id": cid,
-                    "name": name,
-                    "score": score,
-                    "weight": weight,
-                    "justification": just,
-                    "source": "override",
-                }
-            )
+            results[idx] = {
+                "id": cid,
+                "name": name,
+                "score": score,
+                "weight": weight,
+                "justification": just,
+                "source": "override",
+            }
             weighted_sum += score * weight
             continue
 
-        prompt = f"""You are a reviewer assigning a numeric score. Follow instructions precisely.\nCriterion Name: {name}\nInstructions:\n{item['prompt']}\n\nAnalyzer Output (possibly truncated):\n----------------\n{analyzer_output}\n----------------\nRules:\n- Choose ONLY one allowed score: 0.0 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8 0.9 1.0\n- Output EXACTLY two lines:\nSCORE: <value>\nJUSTIFICATION: <concise>\nIf evidence is weak, choose a conservative score.\n"""
+        prompt = CRITERION_PROMPT_TEMPLATE.format(
+            name=name, instructions=item["prompt"]
+        )
+        jobs.append((idx, cid, name, weight, item, prompt))
+
+    if BATCH and len(jobs) > 1:
         if VERBOSE:
-            print(f"Scoring criterion '{cid}' ({name}) ...")
+            print(f"Scoring {len(jobs)} criteria in one batched request ...")
         try:
-            raw = safe_ai_call(client, use_model, prompt)
-            raw_text = str(raw) if raw is not None else ""
-            score, just = parse_ai_response(raw_text)
-            results.append(
-                {
+            raw_batch = safe_ai_call(
+                client, use_model, batch_prompt(jobs, analyzer_output)
+            )
+            batched = parse_batch_response(
+                str(raw_batch or ""), {job[1] for job in jobs}
+            )
+        except Exception as e:
+            if VERBOSE:
+                print(f"  - Batched scoring failed ({e}); scoring individually")
+            batched = {}
+        remaining = []
+        for job in jobs:
+            idx, cid, name, weight = job[:4]
+            if cid not in batched:
+                remaining.append(job)
+                continue
+            score, just, raw_entry = batched[cid]
+            results[idx] = {
+                "id": cid,
+                "name": name,
+                "score": score,
+                "weight": weight,
+                "justification": just,
+                "raw": raw_entry,
+                "source": "ai",
+            }
+            weighted_sum += score * weight
+        jobs = remaining
+
+    # Criteria are independent and network-bound: keep up to CONCURRENCY
+    # requests in flight (still spaced by RATE_LIMIT_SECONDS), then collect
+    # in rubric order so STRICT fails on the same criterion as before.
+    with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), CONCURRENCY))) as pool:
+        futures = []
+        for idx, cid, name, weight, _item, prompt in jobs:
+            if VERBOSE:
+                print(f"Scoring criterion '{cid}' ({name}) ...")
+            future = pool.submit(
+                safe_ai_call, client, use_model, prompt, shared_prefix, prefix_hash
+            )
+            futures.append((idx, cid, name, weight, future))
+        for idx, cid, name, weight, future in futures:
+            try:
+                raw = future.result()
+                raw_text = str(raw) if raw is not None else ""
+                score, just = parse_ai_response(raw_text)
+                results[idx] = {
                     "id": cid,
                     "name": name,
                     "score": score,
@@ -246,14 +718,14 @@ def run_final_scorer(
                     "raw": raw_text,
                     "source": "ai",
                 }
-            )
-            weighted_sum += score * weight
-        except Exception as e:
-            if STRICT:
-                raise RuntimeError(f"Error scoring '{cid}': {e}")
-            else:
-                results.append(
-                    {
+                weighted_sum += score * weight
+            except Exception as e:
+                if STRICT:
+                    for *_, pending in futures:
+                        pending.cancel()
+                    raise RuntimeError(f"Error scoring '{cid}': {e}")
+                else:
+                    results[idx] = {
                         "id": cid,
                         "name": name,
                         "score": 0.0,
@@ -261,64 +733,52 @@ def run_final_scorer(
                         "justification": f"Parse/AI failure: {e}",
                         "source": "error",
                     }
-                )
 
     overall = weighted_sum / total_weight if total_weight else 0.0
 
-    # Optional overall comment summarizing strengths / improvements
-    overall_comment = None
+    # Optional overall comment summarizing strengths / improvements. It only
+    # needs the scores, so the request runs in the background while the
+    # report table is formatted.
+    summary_future = None
     if DO_SUMMARY:
-        try:
-            if VERBOSE:
-                print("Generating overall review comment ...")
-            score_lines = "\n".join(
-                [f"- {r['id']}: {r['name']} => {r['score']:.1f}" for r in results]
-            )
-            summary_prompt = f"""You are an experienced software project reviewer. Produce ONE cohesive overall review comment.\nData available:\n(1) Per-criterion scores (0.0-1.0):\n{score_lines}\nOverall weighted score: {overall:.2f}\n(2) The underlying analyzer output already informed those scores (not repeated here).\nInstructions:\n- Start with a single concise summary sentence capturing overall health.\n- Then provide a short bullet list: Strengths, Risks, Next Steps (each 1-3 bullets).\n- Prioritize actionable technical improvements (security, docs, robustness) over cosmetic. If security issues like leaked credentials arise, address them.\n- Word limit: 160 words total.\nFormat:\nStrengths:\n- ...\nRisks:\n- ...\nNext Steps:\n- ...\nReturn only the comment. Do NOT add extra labels beyond the specified headings.\n"""
-            raw_summary = safe_ai_call(client, MODEL, summary_prompt)
-            overall_comment = (raw_summary or "").strip()
-        except Exception as e:
-            overall_comment = f"(Summary generation failed: {e})"
-
-    # Markdown table
-    md_lines = []
-    md_lines.append(f"# Final Scoring Report\n")
-    md_lines.append(
-        f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
-    )
-    if overall_comment:
-        md_lines.append("\n### Overall Review Comment\n")
-        md_lines.append(overall_comment + "\n\n")
-
-    md_lines.append(f"Overall Score: {overall:.2f} (weighted)\n")
-    md_lines.append("| ID | Criterion | Score | Weight | Justification | Source |")
-    md_lines.append("|----|-----------|-------|--------|---------------|--------|")
-    for r in results:
-        md_lines.append(
-            f"| {r['id']} | {r['name']} | {r['score']:.1f} | {r['weight']:.1f} | {r['justification'].replace('|','/')} | {r['source']} |"
+        if VERBOSE:
+            print("Generating overall review comment ...")
+        score_lines = "\n".join(
+            [f"- {r['id']}: {r['name']} => {r['score']:.1f}" for r in results]
         )
+        summary_prompt = SUMMARY_PROMPT_TEMPLATE.format(
+            score_lines=score_lines, overall=overall
+        )
+        summary_pool = ThreadPoolExecutor(max_workers=1)
+        summary_future = summary_pool.submit(
+            safe_ai_call, client, MODEL, summary_prompt
+        )
+        summary_pool.shutdown(wait=False)
 
-    md_report = "\n".join(md_lines) + "\n"
-    out_json = {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
-        "overall_score": round(overall, 2),
-        "criteria": results,
-        "overall_comment": overall_comment,
-    }
+    md_report, out_json = _render_report(results, overall, summary_future)
+    if not (summary_future is not None and summary_future.exception()):
+        _save_run_result(run_key, out_json, overall)
     return md_report, out_json, _resp_cache, overall
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python final_scorer.py <analyzer_output_file>")
+        print("Usage: python final_scorer.py <analyzer_output_file|->")
         sys.exit(1)
     input_path = sys.argv[1]
-    if not os.path.exists(input_path):
+    if input_path != "-" and not os.path.exists(input_path):
         print(f"Analyzer output file not found: {input_path}")
         sys.exit(1)
-    with open(input_path, "r", encoding="utf-8", errors="ignore") as f:
-        content = f.read()
     is_json = input_path.endswith(".json")
+    # Plain-text input is truncated to MAX_ANALYZER_CHARS anyway, so read only
+    # one char past the budget (enough for run_final_scorer to flag the
+    # truncation). JSON must be read whole to be parsed.
+    limit = -1 if is_json else MAX_ANALYZER_CHARS + 1
+    if input_path == "-":
+        content = sys.stdin.read(limit)
+    else:
+        with open(input_path, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read(limit)
     try:
         md_report, out_json, cache, overall = run_final_scorer(content, is_json=is_json)
     except Exception as e:
@@ -327,7 +787,7 @@ def main():
     with open(OUTPUT_MD, "w", encoding="utf-8") as f_md:
         f_md.write(md_report)
     with open(OUTPUT_JSON, "w", encoding="utf-8") as f_js:
-        json.dump(out_json, f_js, indent=2)
+        f_js.write(_json_pretty(out_json))
     print(f"Final scoring complete. Overall: {overall:.2f}")
     print(f"Markdown: {OUTPUT_MD} | JSON: {OUTPUT_JSON}")
 
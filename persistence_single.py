@@ -1,9 +1,24 @@
 import os
-import json
 import psycopg
 from dotenv import load_dotenv
 from contextlib import contextmanager
-from typing import Optional, Dict, Any
+from threading import Lock
+from typing import Optional, Dict, Any, Sequence
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb, set_json_dumps, set_json_loads
+
+try:  # pooled connections when psycopg_pool is installed
+    from psycopg_pool import ConnectionPool
+except ImportError:  # pragma: no cover - fall back to one connection per call
+    ConnectionPool = None
+
+try:  # C JSON codec for JSON/JSONB columns; psycopg defaults to stdlib json
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+else:
+    set_json_dumps(lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+    set_json_loads(orjson.loads)
 
 load_dotenv()
 
@@ -18,9 +33,46 @@ DB_KW = dict(
 )
 
 
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "4"))
+
+_pool = None
+_pool_lock = Lock()
+
+
+def _conninfo() -> str:
+    if DATABASE_URL:
+        return DATABASE_URL
+    return psycopg.conninfo.make_conninfo(
+        **{k: v for k, v in DB_KW.items() if v is not None}
+    )
+
+
+def _get_pool():
+    """Create the shared pool on first use so importing stays side-effect free."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    conninfo=_conninfo(),
+                    min_size=1,
+                    max_size=max(1, DB_POOL_MAX),
+                    # Validate idle connections on checkout, so a Postgres
+                    # restart costs a reconnect instead of a failed query.
+                    check=ConnectionPool.check_connection,
+                    open=True,
+                )
+    return _pool
+
+
 @contextmanager
 def get_conn():
-    if DATABASE_URL:
+    # Pooled connections skip the TCP/TLS/auth handshake on every query. The
+    # pool commits on a clean exit and rolls back on error, like connect().
+    if ConnectionPool is not None:
+        with _get_pool().connection() as conn:
+            yield conn
+    elif DATABASE_URL:
         with psycopg.connect(DATABASE_URL) as conn:  # type: ignore[arg-type]
             yield conn
     else:
@@ -36,12 +88,24 @@ def init_db(sql_path: str = "init.sql"):
         conn.commit()
 
 
-def create_run(email: str, github_url: str) -> int:
+def create_run(email: str, github_url: str, **initial_fields) -> int:
+    """Insert a run and return its id.
+
+    ``initial_fields`` are extra columns set by the same INSERT (dict/list
+    values are stored as JSONB), saving a follow-up ``update_run_metadata``.
+    """
+    cols = ["email", "github_url"]
+    values = [email, github_url]
+    for k in sorted(initial_fields):
+        v = initial_fields[k]
+        cols.append(k)
+        values.append(Jsonb(v) if isinstance(v, (dict, list)) else v)
+    sql = (
+        f"INSERT INTO analysis_runs ({', '.join(cols)}) "
+        f"VALUES ({', '.join(['%s'] * len(cols))}) RETURNING id"
+    )
     with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """INSERT INTO analysis_runs (email, github_url) VALUES (%s, %s) RETURNING id""",
-            (email, github_url),
-        )
+        cur.execute(sql, values)  # type: ignore[arg-type]
         row = cur.fetchone()
         if not row:
             raise RuntimeError("Failed to insert run (no id returned)")
@@ -53,26 +117,35 @@ def create_run(email: str, github_url: str) -> int:
 def update_run_metadata(run_id: int, **fields):
     if not fields:
         return
+    # Sorted columns give each field set one stable SQL text, so the
+    # server-side prepared statement is reused across runs.
     cols = []
     values = []
-    for k, v in fields.items():
+    for k in sorted(fields):
         cols.append(f"{k}=%s")
-        values.append(v)
+        values.append(fields[k])
     values.append(run_id)
     sql = f"UPDATE analysis_runs SET {', '.join(cols)}, updated_at=NOW() WHERE id=%s"
     with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, values)
+        cur.execute(sql, values, prepare=True)
         conn.commit()
 
 
-def get_run(run_id: int) -> Optional[Dict[str, Any]]:
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("SELECT * FROM analysis_runs WHERE id=%s", (run_id,))
-        row = cur.fetchone()
-        if not row:
-            return None
-        cols = [desc.name for desc in cur.description]  # type: ignore[attr-defined]
-        return dict(zip(cols, row))
+def get_run(
+    run_id: int, columns: Optional[Sequence[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Fetch one run as a dict; ``columns`` limits the SELECT (default: all).
+
+    Passing only the needed columns avoids pulling the large markdown/JSON
+    and AI cache blobs over the wire.
+    """
+    select = ", ".join(columns) if columns else "*"
+    with get_conn() as conn, conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            f"SELECT {select} FROM analysis_runs WHERE id=%s",  # type: ignore[arg-type]
+            (run_id,),
+        )
+        return cur.fetchone()
 
 
 def list_cohorts() -> list[Dict[str, Any]]:
@@ -108,8 +181,8 @@ def store_analyzer_outputs(
     update_run_metadata(
         run_id,
         analyzer_md=md,
-        analyzer_json=json.dumps(json_obj),
-        analyzer_ai_cache=json.dumps(ai_cache),
+        analyzer_json=Jsonb(json_obj),
+        analyzer_ai_cache=Jsonb(ai_cache),
         commit_hash=commit_hash,
         branch_name=branch_name,
         analysis_started_at=json_obj.get("generated_at"),
@@ -129,8 +202,8 @@ def store_scorer_outputs(
     update_run_metadata(
         run_id,
         final_scorer_md=md,
-        final_scorer_json=json.dumps(json_obj),
-        scorer_ai_cache=json.dumps(ai_cache),
+        final_scorer_json=Jsonb(json_obj),
+        scorer_ai_cache=Jsonb(ai_cache),
         overall_score=overall_score,
         scorer_tool_version=tool_version,
         status="DONE",